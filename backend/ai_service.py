@@ -1,16 +1,12 @@
 import os
-import json
+import threading
+import orjson
 from typing import List, Dict, Any
-from openai import OpenAI
 from models import Recommendation
 from yelp_mapper import YelpAIMapper
 
-# Initialize OpenAI client (compatible with Yelp AI if they use OpenAI interface, 
-# otherwise we'd use requests. For this hackathon, we assume standard LLM interface or direct API)
-# Note: Yelp AI API might be different. 
-# If it's a REST API, we should use requests. 
-# Based on requirements: "POST https://api.yelp.com/ai/chat/v2"
-import requests
+# Yelp AI is a plain REST API: "POST https://api.yelp.com/ai/chat/v2"
+# `requests` is imported on first use to keep it off the startup path.
 
 YELP_API_KEY = os.getenv("YELP_API_KEY")
 YELP_AI_ENDPOINT = os.getenv("YELP_AI_ENDPOINT", "https://api.yelp.com/ai/chat/v2")
@@ -23,6 +19,22 @@ class AIService:
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        self._http = None
+        self._http_lock = threading.Lock()
+
+    @property
+    def http(self):
+        """Pooled HTTP session, created on first use so connections to Yelp are reused."""
+        if self._http is None:
+            with self._http_lock:
+                if self._http is None:
+                    import requests
+                    self._http = requests.Session()
+        return self._http
+
+    def warmup(self):
+        """Opens a pooled TLS connection to the Yelp AI host ahead of the first real call."""
+        self.http.head(self.endpoint, timeout=2)
 
     def generate_recommendations(self, session_id: str, prompt: str) -> List[Recommendation]:
         """
@@ -43,9 +55,10 @@ class AIService:
         print(f"Headers: {{'Authorization': 'Bearer {self.api_key}', 'Content-Type': 'application/json'}}")
         print(f"{'='*60}\n")
 
-        response = requests.post(self.endpoint, json=payload, headers=self.headers)
+        response = self.http.post(self.endpoint, json=payload, headers=self.headers)
         response.raise_for_status()
-        data = response.json()
+        # orjson decodes the ~40KB Yelp AI body several times faster than response.json()
+        data = orjson.loads(response.content)
         
         print(f"\n{'='*60}")
         print(f"✅ Response from Yelp AI API:")
@@ -86,9 +99,9 @@ class AIService:
 
         try:
             payload = {"query": prompt}
-            response = requests.post(self.endpoint, json=payload, headers=self.headers)
+            response = self.http.post(self.endpoint, json=payload, headers=self.headers)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Use mapper to parse conflict response
             return YelpAIMapper.parse_conflict_response(data)
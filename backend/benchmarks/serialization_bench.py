@@ -0,0 +1,111 @@
+"""
+Serialization Microbenchmark
+Measures per-request encode/decode cost for the hot payloads:
+  - decoding a Yelp AI body (sample.json) with stdlib json vs orjson
+  - encoding a GET /sessions/{id} snapshot with jsonable_encoder + json (FastAPI's path without a
+    response_model) vs the response_model path (pydantic-core validate + serialize to JSON bytes)
+  - the same payload end to end through an in-process app, untyped (response_model=dict) vs typed
+
+Run from backend/:
+    python benchmarks/serialization_bench.py [iterations]
+"""
+import ast
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import orjson
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import SessionSnapshot  # noqa: E402
+from yelp_mapper import YelpAIMapper  # noqa: E402
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sample.json")
+
+
+def load_sample_body() -> bytes:
+    """sample.json is a captured debug log; rebuild the raw JSON body from its 'Response Data:' line."""
+    with open(SAMPLE_PATH, encoding="utf-8") as f:
+        text = f.read()
+    data = ast.literal_eval(text.split("Response Data:", 1)[1].strip())
+    return json.dumps(data).encode()
+
+
+def build_snapshot_payload(data) -> dict:
+    session_id = str(uuid4())
+    now = datetime.now()
+    participants = [
+        {
+            "id": str(uuid4()),
+            "session_id": session_id,
+            "name": f"Guest {i}",
+            "dietary_restrictions": "Vegetarian" if i % 3 == 0 else None,
+            "cuisine_preferences": "Thai",
+            "budget_tier": "$$",
+            "vibe": "Casual",
+            "is_host": i == 0,
+        }
+        for i in range(10)
+    ]
+    recommendations = []
+    for rec in YelpAIMapper.parse_response(data):
+        row = rec.model_dump()
+        row["id"] = str(uuid4())
+        row["session_id"] = session_id
+        recommendations.append(row)
+    return {
+        "session": {
+            "id": session_id,
+            "host_name": "Host",
+            "location": "West Village, NYC",
+            "scheduled_time": now.isoformat(),
+            "status": "created",
+            "created_at": now.isoformat(),
+            "expires_at": (now + timedelta(hours=24)).isoformat(),
+            "invite_link": f"http://localhost:3000/session/{session_id}",
+            "conflict_analysis": {"has_conflicts": False, "conflicts": [], "resolution": ""},
+        },
+        "participants": participants,
+        "recommendations": recommendations,
+    }
+
+
+def report(name: str, fn, iterations: int):
+    seconds = min(timeit.repeat(fn, number=iterations, repeat=5))
+    print(f"  {name:<42} {seconds / iterations * 1e6:>9.1f} us/op")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    body = load_sample_body()
+    print(f"Decode Yelp AI body ({len(body) / 1024:.1f} KB)")
+    report("json.loads", lambda: json.loads(body), iterations)
+    report("orjson.loads", lambda: orjson.loads(body), iterations)
+
+    payload = build_snapshot_payload(orjson.loads(body))
+    # FastAPI's response_model field wraps a TypeAdapter: validate_python, then dump_json
+    adapter = TypeAdapter(SessionSnapshot)
+    print(f"Encode session snapshot ({len(adapter.dump_json(adapter.validate_python(payload))) / 1024:.1f} KB)")
+    report("jsonable_encoder + json.dumps", lambda: json.dumps(jsonable_encoder(payload)).encode(), iterations)
+    report("response_model validate + dump_json", lambda: adapter.dump_json(adapter.validate_python(payload)), iterations)
+
+    app = FastAPI()
+    app.get("/untyped", response_model=dict)(lambda: payload)
+    app.get("/typed", response_model=SessionSnapshot)(lambda: payload)
+    print("GET through an in-process app (includes TestClient overhead)")
+    with TestClient(app) as client:
+        report("response_model=dict (what get_session uses)", lambda: client.get("/untyped").content, iterations // 10 or 1)
+        report("response_model=SessionSnapshot (typed)", lambda: client.get("/typed").content, iterations // 10 or 1)
+
+
+if __name__ == "__main__":
+    main()
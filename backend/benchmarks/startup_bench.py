@@ -0,0 +1,117 @@
+"""
+Startup Benchmark
+Tracks cold-start cost against the regression budget in startup_budget.json:
+  - import time of `main`, from `python -X importtime`
+  - time to first response: spawn uvicorn with the production flags and poll until it answers
+
+Run from backend/:
+    python benchmarks/startup_bench.py [runs]
+Exits non-zero when the median of either metric is over budget.
+"""
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_budget.json")
+
+# Production profile without network warmup, so the numbers only measure this process
+BENCH_ENV = dict(
+    os.environ,
+    APP_PROFILE="production",
+    WARMUP_ON_STARTUP="0",
+    SUPABASE_URL="",
+    SUPABASE_KEY="",
+)
+
+
+def measure_import(top: int = 0):
+    """Returns the cumulative import time of `main` in ms, plus its slowest direct imports."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, env=BENCH_ENV, capture_output=True, text=True, check=True,
+    )
+    main_us = 0
+    direct = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        # Children are printed before their parent, two spaces deeper
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            if name.strip() == "main":
+                main_us = int(cumulative)
+                break
+            direct = []
+        elif depth == 1:
+            direct.append((int(cumulative), name.strip()))
+    direct.sort(reverse=True)
+    return main_us / 1000, direct[:top]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_first_response(timeout: float = 30.0) -> float:
+    """Returns ms from spawning uvicorn to the first successful HTTP response."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/metrics/votes"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--loop", "uvloop", "--http", "httptools", "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=BENCH_ENV, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError(f"No response from uvicorn within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with open(BUDGET_PATH) as f:
+        budget = json.load(f)
+
+    _, slowest = measure_import(top=8)
+    import_ms = statistics.median(measure_import()[0] for _ in range(runs))
+    first_response_ms = statistics.median(measure_first_response() for _ in range(runs))
+
+    print("Slowest direct imports of main:")
+    for cumulative_us, name in slowest:
+        print(f"  {name:<24} {cumulative_us / 1000:>8.1f} ms")
+    print(f"Median of {runs} runs:")
+
+    over_budget = False
+    for name, value in (("import_ms", import_ms), ("first_response_ms", first_response_ms)):
+        limit = budget[name]
+        status = "ok" if value <= limit else "OVER BUDGET"
+        over_budget = over_budget or value > limit
+        print(f"  {name:<18} {value:>8.1f} ms  (budget {limit} ms)  {status}")
+
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,9 @@
 import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+import threading
+from typing import TYPE_CHECKING
 
-load_dotenv()
-
-url: str = os.environ.get("SUPABASE_URL", "")
-key: str = os.environ.get("SUPABASE_KEY", "")
+if TYPE_CHECKING:
+    from supabase import Client
 
 # Mock client if keys are missing (for local dev without keys)
 class MockSupabase:
@@ -13,15 +11,43 @@ class MockSupabase:
         return self
     def insert(self, data):
         return self
+    def upsert(self, data):
+        return self
     def select(self, *args):
         return self
     def eq(self, *args):
         return self
+    def limit(self, *args):
+        return self
     def execute(self):
         return {"data": [], "error": None}
 
-if not url or not key:
-    print("Warning: Supabase credentials not found. Using Mock client.")
-    supabase: Client = MockSupabase()
-else:
-    supabase: Client = create_client(url, key)
+_client = None
+_client_lock = threading.Lock()
+
+def get_client() -> "Client":
+    """Builds the Supabase client on first use (importing supabase is slow, so keep it off the startup path)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                url: str = os.environ.get("SUPABASE_URL", "")
+                key: str = os.environ.get("SUPABASE_KEY", "")
+                if not url or not key:
+                    print("Warning: Supabase credentials not found. Using Mock client.")
+                    _client = MockSupabase()
+                else:
+                    from supabase import create_client
+                    _client = create_client(url, key)
+    return _client
+
+class LazySupabase:
+    """Stands in for the client and forwards every call to get_client()."""
+    def __getattr__(self, name):
+        return getattr(get_client(), name)
+
+supabase: "Client" = LazySupabase()
+
+def warmup():
+    """Builds the client and opens a connection to Supabase with a trivial query."""
+    supabase.table("sessions").select("id").limit(1).execute()
@@ -1,30 +1,76 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+import os
+
+# Cloud Run injects env vars directly; only read .env outside the production profile.
+# Must run before the imports below, which read env vars at import time.
+if os.getenv("APP_PROFILE") != "production":
+    from dotenv import load_dotenv
+    load_dotenv()
+
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Header
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
-import os
-from uuid import uuid4, UUID
+from uuid import uuid4
 from datetime import datetime, timedelta
-from typing import List
 
 from models import (
     SessionCreate, SessionResponse, 
     ParticipantCreate, ParticipantResponse,
-    VoteCreate, Recommendation
+    VoteCreate, SessionSnapshot
 )
+import database
 from database import supabase
 from ai_service import AIService
+from vote_buffer import VoteBuffer, VoteBufferFull
+import profiler
+from profiler import profiled
 
 import logging
+import threading
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-load_dotenv()
+def warmup_connections():
+    # Pay client construction and TLS handshakes before the first request, not during it.
+    # Warmups run in daemon threads and startup waits at most WARMUP_TIMEOUT_S, so a slow
+    # or unreachable backend can't stall a cold start; a late warmup finishes in the background.
+    if os.getenv("WARMUP_ON_STARTUP", "0") != "1":
+        return
+    deadline = time.monotonic() + float(os.getenv("WARMUP_TIMEOUT_S", "2"))
+
+    def run(name, warmup):
+        try:
+            warmup()
+        except Exception as e:
+            logger.warning(f"Warmup of {name} connection failed: {e}")
+
+    threads = [
+        threading.Thread(target=run, args=(name, warmup), name=f"warmup-{name}", daemon=True)
+        for name, warmup in (("supabase", database.warmup), ("yelp", ai_service.warmup))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+        if thread.is_alive():
+            logger.warning(f"{thread.name} still running after timeout; continuing startup")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    vote_buffer.start()
+    await run_in_threadpool(warmup_connections)
+    yield
+    # Write out any votes still sitting in memory
+    await run_in_threadpool(vote_buffer.stop)
 
-app = FastAPI(title="Social Dining API")
+app = FastAPI(title="Social Dining API", lifespan=lifespan)
 ai_service = AIService()
+vote_buffer = VoteBuffer(supabase)
 
 # CORS Configuration
 origins = [
@@ -40,7 +86,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in per request (admin header) or by PROFILE_SAMPLE_RATE; @profiled handlers pick this up
+app.add_middleware(profiler.ProfilerMiddleware)
+
+def require_admin(x_admin_token: str = Header(None)):
+    if not profiler.is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@app.get("/metrics/votes")
+def vote_metrics():
+    return vote_buffer.metrics()
+
+@app.get("/admin/profiles", dependencies=[Depends(require_admin)])
+def list_profiles():
+    return profiler.list_profiles()
+
+@app.get("/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+def get_profile(profile_id: str):
+    profile = profiler.load_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+@app.get("/admin/profiles/{profile_id}/collapsed", dependencies=[Depends(require_admin)], response_class=PlainTextResponse)
+def get_profile_stacks(profile_id: str):
+    # Collapsed-stack format: open in https://www.speedscope.app or pipe to flamegraph.pl
+    stacks = profiler.load_collapsed(profile_id)
+    if stacks is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return stacks
+
 @app.post("/sessions", response_model=SessionResponse)
+@profiled
 def create_session(session: SessionCreate):
     session_id = str(uuid4())
     now = datetime.now()
@@ -62,9 +139,14 @@ def create_session(session: SessionCreate):
     
     # If using mock, data.data might be empty list or the object
     # For simplicity, just return the object we created
+    # FastAPI validates and serializes it to JSON bytes via response_model
     return new_session
 
-@app.get("/sessions/{session_id}", response_model=dict)
+# Served as a plain dict: response_model=dict is already on FastAPI's dump_json fast path and
+# passes every column through, while validating a SessionSnapshot costs ~120us on this polled
+# endpoint (see benchmarks/serialization_bench.py). The snapshot is only used to document the shape.
+@app.get("/sessions/{session_id}", response_model=dict, responses={200: {"model": SessionSnapshot}})
+@profiled
 def get_session(session_id: str):
     # Fetch session
     session_res = supabase.table("sessions").select("*").eq("id", session_id).execute()
@@ -81,9 +163,14 @@ def get_session(session_id: str):
     recommendations_res = supabase.table("recommendations").select("*").eq("session_id", session_id).execute()
     recommendations_data = recommendations_res.data if recommendations_res.data else []
     
-    # Fetch votes
+    # Fetch votes (write out buffered votes first so counts are current)
+    vote_buffer.flush(session_id)
     votes_res = supabase.table("votes").select("*").eq("session_id", session_id).execute()
     votes = votes_res.data if votes_res.data else []
+    # If the flush failed, count the votes still queued so the read isn't stale.
+    # A queued vote may already be in the DB (partial or timed-out write), so dedupe by id.
+    seen = {v["id"] for v in votes}
+    votes += [v for v in vote_buffer.pending(session_id) if v["id"] not in seen]
     
     # Aggregate votes per recommendation
     recommendations = []
@@ -105,6 +192,7 @@ def get_session(session_id: str):
     }
 
 @app.post("/sessions/{session_id}/join", response_model=ParticipantResponse)
+@profiled
 def join_session(session_id: str, participant: ParticipantCreate):
     # Check cap
     participants_res = supabase.table("participants").select("*").eq("session_id", session_id).execute()
@@ -135,6 +223,7 @@ def join_session(session_id: str, participant: ParticipantCreate):
     return new_participant
 
 @app.post("/sessions/{session_id}/generate")
+@profiled
 def generate_recommendations(session_id: str, background_tasks: BackgroundTasks):
     # Trigger AI in background or synchronous?
     # For hackathon, synchronous might be easier to debug, but slow.
@@ -232,11 +321,13 @@ def generate_recommendations(session_id: str, background_tasks: BackgroundTasks)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/sessions/{session_id}/vote")
+@profiled
 def cast_vote(session_id: str, vote: VoteCreate):
     # Verify session exists
     # Verify participant exists (optional but good)
     
     new_vote = {
+        "id": str(uuid4()), # Pre-generated so bulk upserts are idempotent on retry
         "session_id": session_id,
         "participant_id": str(vote.participant_id),
         "venue_id": vote.venue_id,
@@ -244,15 +335,11 @@ def cast_vote(session_id: str, vote: VoteCreate):
         "created_at": datetime.now().isoformat()
     }
     
-    # We don't have a votes table in schema.sql yet! 
-    # Let's add it or just log it for now.
-    # Actually, let's add it to schema.sql first? 
-    # The user already ran schema.sql. 
-    # I should probably ask user to run an update or just create it if not exists?
-    # For now, let's assume user will add it.
-    
-    # Insert into DB
-    supabase.table("votes").insert(new_vote).execute()
+    # Queue for bulk write; the flusher upserts on size/time threshold
+    try:
+        vote_buffer.add(new_vote)
+    except VoteBufferFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
     
     return {"status": "voted", "message": "Vote recorded"}
 
@@ -260,6 +347,7 @@ class BookRequest(BaseModel):
     business_id: str
 
 @app.post("/sessions/{session_id}/book")
+@profiled
 def book_session(session_id: str, request: BookRequest):
     # Fetch session for details
     session_res = supabase.table("sessions").select("*").eq("id", session_id).execute()
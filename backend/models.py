@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, field_validator
+from typing import Any, List, Optional
 from datetime import datetime
 from uuid import UUID, uuid4
 
@@ -46,6 +46,26 @@ class ConflictAnalysis(BaseModel):
     conflicts: List[str] = []
     resolution: str = ""
 
+    @classmethod
+    def from_raw(cls, raw: Any) -> "ConflictAnalysis":
+        """
+        Builds an analysis from whatever the LLM (or an old DB row) produced.
+        Nulls, non-string conflicts and string booleans are coerced instead of rejected.
+        """
+        if not isinstance(raw, dict):
+            return cls()
+        has_conflicts = raw.get("has_conflicts")
+        if isinstance(has_conflicts, str):
+            has_conflicts = has_conflicts.strip().lower() in ("true", "yes", "1")
+        conflicts = raw.get("conflicts") or []
+        if not isinstance(conflicts, list):
+            conflicts = [conflicts]
+        return cls(
+            has_conflicts=bool(has_conflicts),
+            conflicts=[str(c) for c in conflicts if c is not None],
+            resolution=str(raw.get("resolution") or "")
+        )
+
 class Recommendation(BaseModel):
     id: Optional[str] = None # Generated by DB
     business_id: str
@@ -60,3 +80,35 @@ class Recommendation(BaseModel):
     why_picked: str = ""
     trade_offs: List[str] = []
 
+
+# Typed payloads for GET /sessions/{id}. Every column that is nullable in
+# consolidated_schema.sql is Optional here, so an old or partial row can't fail the read.
+class SessionDetail(SessionResponse):
+    status: Optional[str] = None
+    created_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    invite_link: Optional[str] = None
+    booking_status: Optional[str] = "none"
+    conflict_analysis: Optional[ConflictAnalysis] = None
+
+    @field_validator("conflict_analysis", mode="before")
+    @classmethod
+    def coerce_conflict_analysis(cls, value):
+        # Stored as free-form jsonb from the LLM; normalise rather than reject
+        return None if value is None else ConflictAnalysis.from_raw(value)
+
+class ParticipantDetail(ParticipantResponse):
+    session_id: Optional[UUID] = None
+    is_host: Optional[bool] = False
+
+class RecommendationDetail(Recommendation):
+    session_id: Optional[UUID] = None
+    rating: Optional[float] = None
+    categories: Optional[List[Optional[str]]] = []
+    why_picked: Optional[str] = ""
+    trade_offs: Optional[List[Optional[str]]] = []
+
+class SessionSnapshot(BaseModel):
+    session: SessionDetail
+    participants: List[ParticipantDetail] = []
+    recommendations: List[RecommendationDetail] = []
@@ -0,0 +1,295 @@
+"""
+On-demand Request Profiler
+Samples the handler thread's stack while a request runs and stores the result
+as a collapsed-stack file (loads directly in speedscope or flamegraph.pl).
+
+A request is profiled when it sends `X-Profile: 1` with a valid `X-Admin-Token`,
+or when it is picked by PROFILE_SAMPLE_RATE. Only @profiled handlers are sampled;
+admin routes never are.
+
+Profiles are written to PROFILE_DIR on the instance that served the request, and
+the summary is also logged so it can be found when the instance is gone or when
+/admin/profiles is answered by another instance.
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import secrets
+import threading
+import contextvars
+import functools
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/social-dining-profiles")
+PROFILE_MAX_FILES = max(1, int(os.getenv("PROFILE_MAX_FILES", "50")))
+
+ADMIN_PATH_PREFIX = "/admin/"
+
+# Handler wall time is attributed to a component when any frame in the sample belongs
+# to one of its modules, so nested components (mapper inside AIService) overlap.
+# Serialization is measured separately: FastAPI validates and encodes the response
+# after the handler returns, outside the sampled thread.
+COMPONENTS = {
+    "ai_service": ("ai_service", "requests", "urllib3"),
+    "database": ("database", "vote_buffer", "supabase", "postgrest", "httpx", "httpcore"),
+    "yelp_mapper": ("yelp_mapper",),
+}
+
+PROFILE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+@dataclass
+class _Samples:
+    stacks: Counter = field(default_factory=Counter)
+    count: int = 0
+
+
+@dataclass
+class ProfileRequest:
+    id: str
+    method: str
+    path: str
+    reason: str
+    started: float = field(default_factory=time.perf_counter)
+    # Filled in by the @profiled wrapper; stays None when the route isn't profiled
+    handler: Optional[str] = None
+    handler_ms: float = 0.0
+    handler_ended: Optional[float] = None
+    samples: Optional[_Samples] = None
+    saved: bool = False
+
+
+current_profile: "contextvars.ContextVar[Optional[ProfileRequest]]" = contextvars.ContextVar("current_profile", default=None)
+
+
+def is_admin(token: Optional[str]) -> bool:
+    # compare_digest only accepts ASCII str, so compare bytes to handle any header value
+    return bool(ADMIN_TOKEN) and bool(token) and secrets.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def should_profile(scope) -> Optional[str]:
+    """Returns why a request should be profiled ("header" or "sampled"), or None."""
+    if scope["path"].startswith(ADMIN_PATH_PREFIX):
+        return None
+    if ADMIN_TOKEN and _header(scope, b"x-profile") == "1" and is_admin(_header(scope, b"x-admin-token")):
+        return "header"
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+class ProfilerMiddleware:
+    """
+    Pure ASGI middleware that opts a request into profiling by setting `current_profile`.
+    Passes straight through when neither ADMIN_TOKEN nor PROFILE_SAMPLE_RATE is set.
+    The profile is saved when the response starts, and only then is `X-Profile-Id` added.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (ADMIN_TOKEN or PROFILE_SAMPLE_RATE > 0):
+            return await self.app(scope, receive, send)
+        reason = should_profile(scope)
+        if reason is None:
+            return await self.app(scope, receive, send)
+
+        profile = ProfileRequest(id=uuid4().hex, method=scope["method"], path=scope["path"], reason=reason)
+
+        async def send_with_profile(message):
+            if message["type"] == "http.response.start" and _save_once(profile, time.perf_counter()):
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        token = current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            current_profile.reset(token)
+            # Handler raised before a response started: still keep the profile
+            _save_once(profile)
+
+
+def _save_once(profile: ProfileRequest, response_started: Optional[float] = None) -> bool:
+    """Saves the profile if its handler was sampled. Returns True once it is stored."""
+    if profile.samples is None or profile.saved:
+        return profile.saved
+    try:
+        _save(profile, response_started)
+        profile.saved = True
+    except Exception as e:
+        logger.warning(f"Failed to save profile {profile.id}: {e}")
+    return profile.saved
+
+
+class _Sampler(threading.Thread):
+    """Periodically captures one thread's stack via sys._current_frames()."""
+
+    def __init__(self, thread_id: int, root_frame, interval: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.root_frame = root_frame
+        self.interval = interval
+        self.samples = _Samples()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            # Walk up to (not including) the profiled() wrapper; threadpool frames above it are noise
+            while frame is not None and frame is not self.root_frame:
+                module = frame.f_globals.get("__name__", "?")
+                stack.append(f"{module}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples.stacks[";".join(reversed(stack))] += 1
+                self.samples.count += 1
+
+    def stop(self) -> _Samples:
+        self._stop_event.set()
+        self.join()
+        return self.samples
+
+
+def profiled(func):
+    """
+    Wraps a sync route handler so it is sampled when the current request opted in.
+    Costs one ContextVar lookup when the request isn't profiled.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = current_profile.get()
+        if profile is None:
+            return func(*args, **kwargs)
+
+        sampler = _Sampler(threading.get_ident(), sys._getframe(), PROFILE_INTERVAL_MS / 1000)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.handler_ended = time.perf_counter()
+            profile.handler_ms = (profile.handler_ended - start) * 1000
+            profile.samples = sampler.stop()
+            profile.handler = func.__name__
+
+    return wrapper
+
+
+def _breakdown(samples: _Samples, wall_ms: float) -> Dict[str, float]:
+    if not samples.count:
+        return {name: 0.0 for name in COMPONENTS}
+    ms_per_sample = wall_ms / samples.count
+    breakdown = {}
+    for name, modules in COMPONENTS.items():
+        hits = 0
+        for stack, count in samples.stacks.items():
+            frame_modules = (frame.split(":", 1)[0] for frame in stack.split(";"))
+            if any(m.split(".", 1)[0] in modules for m in frame_modules):
+                hits += count
+        breakdown[name] = round(hits * ms_per_sample, 2)
+    return breakdown
+
+
+def _save(profile: ProfileRequest, response_started: Optional[float]):
+    samples = profile.samples
+    request_ms = ((response_started or time.perf_counter()) - profile.started) * 1000
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    collapsed = "\n".join(f"{stack} {count}" for stack, count in samples.stacks.most_common())
+    with open(os.path.join(PROFILE_DIR, f"{profile.id}.collapsed"), "w") as f:
+        f.write(collapsed + "\n" if collapsed else "")
+
+    breakdown = _breakdown(samples, profile.handler_ms)
+    # Handler return to response start: response_model validation + JSON encoding.
+    # Routing, body parsing and threadpool wait happen before the handler and aren't counted.
+    # Zero when no response started (the handler raised).
+    serialization_ms = 0.0
+    if response_started is not None and profile.handler_ended is not None:
+        serialization_ms = max(0.0, (response_started - profile.handler_ended) * 1000)
+    breakdown["serialization"] = round(serialization_ms, 2)
+    meta = {
+        "id": profile.id,
+        "method": profile.method,
+        "path": profile.path,
+        "handler": profile.handler,
+        "reason": profile.reason,
+        "created_at": datetime.now().isoformat(),
+        "wall_ms": round(request_ms, 2),
+        "handler_ms": round(profile.handler_ms, 2),
+        "samples": samples.count,
+        "interval_ms": PROFILE_INTERVAL_MS,
+        "breakdown_ms": breakdown,
+    }
+    with open(os.path.join(PROFILE_DIR, f"{profile.id}.json"), "w") as f:
+        json.dump(meta, f)
+    logger.info(f"Request profile: {json.dumps(meta)}")
+    _prune()
+
+
+def _prune():
+    metas = sorted(
+        (os.path.join(PROFILE_DIR, name) for name in os.listdir(PROFILE_DIR) if name.endswith(".json")),
+        key=os.path.getmtime,
+    )
+    for path in metas[:-PROFILE_MAX_FILES]:
+        for ext in (".json", ".collapsed"):
+            try:
+                os.remove(path[:-len(".json")] + ext)
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Returns stored profile summaries, newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in os.listdir(PROFILE_DIR):
+        if name.endswith(".json"):
+            meta = load_profile(name[:-len(".json")])
+            if meta:
+                profiles.append(meta)
+    return sorted(profiles, key=lambda p: p["created_at"], reverse=True)
+
+
+def load_profile(profile_id: str) -> Optional[Dict[str, Any]]:
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    try:
+        with open(os.path.join(PROFILE_DIR, f"{profile_id}.json")) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def load_collapsed(profile_id: str) -> Optional[str]:
+    if not PROFILE_ID_RE.match(profile_id):
+        return None
+    try:
+        with open(os.path.join(PROFILE_DIR, f"{profile_id}.collapsed")) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
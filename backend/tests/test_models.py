@@ -0,0 +1,38 @@
+from models import ConflictAnalysis, SessionSnapshot
+from yelp_mapper import YelpAIMapper
+
+SESSION_ID = "2b1c9b5e-4a6f-4d5c-9a53-3d6f8a2f1e11"
+
+
+def test_snapshot_accepts_nullable_columns():
+    snapshot = SessionSnapshot(
+        session={
+            "id": SESSION_ID,
+            "host_name": "Host",
+            "location": "NYC",
+            "status": None,
+            "created_at": None,
+            "expires_at": None,
+            "invite_link": None,
+            "booking_status": None,
+            "conflict_analysis": {"has_conflicts": True, "conflicts": ["Vegan vs Steakhouse", 3, None], "resolution": None},
+        },
+        participants=[{"id": SESSION_ID, "session_id": None, "name": "Ann", "is_host": None}],
+        recommendations=[{"business_id": "b", "name": "Cafe", "rating": None, "categories": None, "why_picked": None, "trade_offs": None}],
+    )
+    analysis = snapshot.session.conflict_analysis
+    assert analysis.resolution == ""
+    assert analysis.conflicts == ["Vegan vs Steakhouse", "3"]
+    assert snapshot.participants[0].is_host is None
+
+
+def test_conflict_analysis_from_raw_coerces_llm_output():
+    assert ConflictAnalysis.from_raw("not a dict") == ConflictAnalysis()
+    analysis = ConflictAnalysis.from_raw({"has_conflicts": "false", "conflicts": "Budget mismatch"})
+    assert analysis.has_conflicts is False
+    assert analysis.conflicts == ["Budget mismatch"]
+
+
+def test_parse_conflict_response_normalises_nulls():
+    result = YelpAIMapper.parse_conflict_response({"response": '{"has_conflicts": true, "conflicts": null, "resolution": null}'})
+    assert result == {"has_conflicts": True, "conflicts": [], "resolution": ""}
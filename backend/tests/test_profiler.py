@@ -0,0 +1,87 @@
+import types
+
+import pytest
+from fastapi.testclient import TestClient
+
+import database
+import main
+import profiler
+
+SESSION_ID = "2b1c9b5e-4a6f-4d5c-9a53-3d6f8a2f1e11"
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+class FakeQuery:
+    def __init__(self, table):
+        self.table_name = table
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        if self.table_name == "sessions":
+            return types.SimpleNamespace(data=[{"id": SESSION_ID, "host_name": "Host", "location": "NYC"}])
+        return types.SimpleNamespace(data=[])
+
+
+class FakeClient:
+    def table(self, name):
+        return FakeQuery(name)
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(database, "_client", FakeClient())
+    monkeypatch.setattr(profiler, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(profiler, "PROFILE_DIR", str(tmp_path))
+    with TestClient(main.app) as c:
+        yield c
+
+
+def test_header_opt_in_stores_profile(client):
+    response = client.get(f"/sessions/{SESSION_ID}", headers={"X-Profile": "1", **ADMIN})
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+
+    meta = client.get(f"/admin/profiles/{profile_id}", headers=ADMIN).json()
+    assert meta["handler"] == "get_session"
+    assert set(meta["breakdown_ms"]) == {"ai_service", "database", "yelp_mapper", "serialization"}
+    assert client.get(f"/admin/profiles/{profile_id}/collapsed", headers=ADMIN).status_code == 200
+
+
+def test_unprofiled_requests_get_no_profile_id(client, monkeypatch):
+    assert "X-Profile-Id" not in client.get(f"/sessions/{SESSION_ID}").headers
+
+    # Sampled, but the route has no @profiled handler (or is an admin route): nothing stored, no header
+    monkeypatch.setattr(profiler, "PROFILE_SAMPLE_RATE", 1.0)
+    assert "X-Profile-Id" not in client.get("/metrics/votes").headers
+    assert "X-Profile-Id" not in client.get("/admin/profiles", headers=ADMIN).headers
+    assert client.get("/admin/profiles", headers=ADMIN).json() == []
+
+
+def test_admin_endpoints_require_token(client):
+    assert client.get("/admin/profiles").status_code == 403
+
+
+def test_non_ascii_admin_token_is_rejected_not_500(client):
+    bad = {"X-Admin-Token": "sécret".encode("latin-1")}
+    response = client.get(f"/sessions/{SESSION_ID}", headers={"X-Profile": "1", **bad})
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert client.get("/admin/profiles", headers=bad).status_code == 403
+
+
+def test_serialization_excludes_time_before_handler(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiler, "PROFILE_DIR", str(tmp_path))
+    now = 1000.0
+    # Entered the middleware 1s before the handler ended (routing, threadpool wait, handler)
+    profile = profiler.ProfileRequest(id="a" * 32, method="GET", path="/", reason="header", started=now - 1.0)
+    profile.samples = profiler._Samples()
+    profile.handler = "get_session"
+    profile.handler_ms = 200.0
+    profile.handler_ended = now
+
+    profiler._save(profile, now + 0.01)
+    meta = profiler.load_profile(profile.id)
+    assert meta["breakdown_ms"]["serialization"] == pytest.approx(10.0)
+    assert meta["wall_ms"] == pytest.approx(1010.0)
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+import database
+import main
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_supabase_is_imported_on_first_use():
+    # Fresh interpreter: this test session may already have supabase loaded
+    script = (
+        "import sys, database\n"
+        "assert 'supabase' not in sys.modules, 'imported at module load'\n"
+        "database.supabase.table('sessions')\n"
+        "assert 'supabase' in sys.modules, 'not imported on first use'\n"
+    )
+    env = dict(os.environ, SUPABASE_URL="https://example.supabase.co", SUPABASE_KEY="dummy")
+    result = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_hanging_warmup_does_not_block_startup(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setenv("WARMUP_ON_STARTUP", "1")
+    monkeypatch.setenv("WARMUP_TIMEOUT_S", "0.2")
+    monkeypatch.setattr(database, "warmup", lambda: release.wait(10))
+    monkeypatch.setattr(main.ai_service, "warmup", lambda: None)
+    try:
+        start = time.monotonic()
+        with TestClient(main.app) as client:
+            elapsed = time.monotonic() - start
+            assert client.get("/metrics/votes").status_code == 200
+        assert elapsed < 2
+    finally:
+        release.set()
@@ -0,0 +1,125 @@
+import pytest
+
+from vote_buffer import VoteBuffer, VoteBufferFull
+
+
+class APIError(Exception):
+    """Stands in for postgrest's APIError, which carries the SQLSTATE in `code`."""
+
+    def __init__(self, code):
+        super().__init__(f"SQLSTATE {code}")
+        self.code = code
+
+
+class FakeClient:
+    """Records upserted rows; fails rows listed in `bad_ids` or the next `outages` calls."""
+
+    def __init__(self, bad_ids=(), outages=0, outage_batches=()):
+        self.rows = []
+        self.calls = 0
+        self.bad_ids = set(bad_ids)
+        self.outages = outages
+        # Batches (as id lists) that fail once with a transient error
+        self.outage_batches = [list(b) for b in outage_batches]
+        self._pending = None
+
+    def table(self, name):
+        return self
+
+    def upsert(self, rows):
+        self._pending = rows
+        return self
+
+    def execute(self):
+        self.calls += 1
+        if self.outages:
+            self.outages -= 1
+            raise ConnectionError("supabase unreachable")
+        ids = [v["id"] for v in self._pending]
+        if ids in self.outage_batches:
+            self.outage_batches.remove(ids)
+            raise ConnectionError("connection reset")
+        if any(v["id"] in self.bad_ids for v in self._pending):
+            raise APIError("23503")  # foreign key violation
+        self.rows.extend(self._pending)
+
+
+def vote(vote_id, session_id="s1"):
+    return {"id": vote_id, "session_id": session_id, "participant_id": "p", "venue_id": "v", "score": 1}
+
+
+def test_flush_writes_votes_in_per_session_order():
+    client = FakeClient()
+    buffer = VoteBuffer(client)
+    for i, session_id in enumerate(["a", "b", "a", "b"]):
+        buffer.add(vote(i, session_id))
+
+    assert buffer.flush() == 4
+    assert [v["id"] for v in client.rows] == [0, 2, 1, 3]
+    assert buffer.metrics()["queue_depth"] == 0
+
+
+def test_bad_vote_is_dead_lettered_without_blocking_others():
+    client = FakeClient(bad_ids={"bad"})
+    buffer = VoteBuffer(client)
+    buffer.add(vote(1, "a"))
+    buffer.add(vote("bad", "bogus-session"))
+    buffer.add(vote(2, "b"))
+
+    assert buffer.flush() == 2
+    assert sorted(v["id"] for v in client.rows) == [1, 2]
+    metrics = buffer.metrics()
+    assert metrics["dead_lettered_votes"] == 1
+    assert metrics["queue_depth"] == 0
+    assert metrics["failed_flushes"] == 0
+
+
+def test_transient_failure_mid_bisection_requeues_only_unhandled_votes():
+    client = FakeClient(bad_ids={"bad"}, outage_batches=[[2, 3]])
+    buffer = VoteBuffer(client)
+    for vote_id in [1, "bad", 2, 3]:
+        buffer.add(vote(vote_id))
+
+    assert buffer.flush() == 1
+    assert [v["id"] for v in client.rows] == [1]
+    assert [v["id"] for v in buffer.pending("s1")] == [2, 3]
+
+    assert buffer.flush() == 2
+    assert [v["id"] for v in client.rows] == [1, 2, 3]
+    metrics = buffer.metrics()
+    assert metrics["dead_lettered_votes"] == 1
+    assert metrics["flushed_votes"] == 3
+
+
+def test_transient_failure_requeues_in_order_and_backs_off():
+    client = FakeClient(outages=1)
+    buffer = VoteBuffer(client, flush_interval=0.5)
+    buffer.add(vote(1))
+    assert buffer.flush() == 0
+
+    buffer.add(vote(2))
+    assert [v["id"] for v in buffer.pending("s1")] == [1, 2]
+    metrics = buffer.metrics()
+    assert metrics["failed_flushes"] == 1
+    assert metrics["retry_backoff_ms"] == 500
+
+    assert buffer.flush("s1") == 2
+    assert [v["id"] for v in client.rows] == [1, 2]
+    assert buffer.metrics()["retry_backoff_ms"] == 0
+
+
+def test_add_rejects_votes_past_queue_cap():
+    buffer = VoteBuffer(FakeClient(), max_queue=2)
+    buffer.add(vote(1))
+    buffer.add(vote(2))
+    with pytest.raises(VoteBufferFull):
+        buffer.add(vote(3))
+    assert buffer.metrics()["rejected_votes"] == 1
+
+
+def test_stop_retries_before_giving_up():
+    client = FakeClient(outages=1)
+    buffer = VoteBuffer(client)
+    buffer.add(vote(1))
+    buffer.stop()
+    assert [v["id"] for v in client.rows] == [1]
@@ -0,0 +1,234 @@
+"""
+Write-behind Vote Buffer
+Queues votes in memory (ordered per session) and flushes them to Supabase as bulk upserts.
+"""
+import os
+import json
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+VOTE_FLUSH_SIZE = int(os.getenv("VOTE_FLUSH_SIZE", "50"))
+VOTE_FLUSH_INTERVAL_MS = int(os.getenv("VOTE_FLUSH_INTERVAL_MS", "500"))
+VOTE_MAX_QUEUE = int(os.getenv("VOTE_MAX_QUEUE", "10000"))
+VOTE_MAX_BACKOFF_S = 30.0
+
+
+class VoteBufferFull(Exception):
+    """Raised by VoteBuffer.add when the queue is at its depth cap."""
+
+
+def _is_data_error(e: Exception) -> bool:
+    # PostgREST APIError carries the SQLSTATE in `code`. Classes 22 (data exception)
+    # and 23 (integrity violation, e.g. unknown session/participant FK) are caused by
+    # a row and will never succeed on retry; anything else is treated as transient.
+    code = getattr(e, "code", None)
+    return isinstance(code, str) and code[:2] in ("22", "23")
+
+
+class VoteBuffer:
+    """
+    Acknowledges votes as soon as they are queued and writes them in batches.
+
+    A flush is triggered when the queue reaches `max_batch` votes or when
+    `flush_interval` seconds have passed, whichever comes first. Call
+    `flush(session_id)` and then merge `pending(session_id)` to read a
+    consistent view even when the flush fails.
+
+    A batch rejected for bad data is split until the offending votes are
+    isolated; those are dead-lettered (logged and counted) so they can't
+    block other votes. Transient failures re-queue the batch and back off.
+    """
+
+    def __init__(self, client, max_batch: int = VOTE_FLUSH_SIZE, flush_interval: float = VOTE_FLUSH_INTERVAL_MS / 1000,
+                 max_queue: int = VOTE_MAX_QUEUE):
+        self.client = client
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+
+        # session_id -> votes in arrival order
+        self._queues: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._depth = 0
+        self._lock = threading.Lock()
+        # Serializes flushes so a read-triggered flush waits for any in-flight batch
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Background flushes wait until _retry_at after a transient failure
+        self._backoff = 0.0
+        self._retry_at = 0.0
+
+        # Metrics
+        self._max_depth = 0
+        self._flush_count = 0
+        self._failed_flushes = 0
+        self._flushed_votes = 0
+        self._dead_lettered = 0
+        self._rejected = 0
+        self._last_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+        self._max_flush_ms = 0.0
+
+    def start(self):
+        """Starts the background flusher thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vote-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, attempts: int = 3):
+        """Stops the flusher thread and writes out anything still queued."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+        for attempt in range(attempts):
+            self.flush()
+            if not self._depth:
+                return
+            if attempt < attempts - 1:
+                time.sleep(0.5 * (attempt + 1))
+
+        # Last resort: log the votes so they can be replayed by hand
+        with self._lock:
+            lost = [v for votes in self._queues.values() for v in votes]
+        logger.error(f"Dropping {len(lost)} unflushed votes at shutdown: {json.dumps(lost)}")
+
+    def add(self, vote: Dict[str, Any]):
+        """Queues a vote. Wakes the flusher once the size threshold is reached."""
+        with self._lock:
+            if self._depth >= self.max_queue:
+                self._rejected += 1
+                raise VoteBufferFull(f"Vote queue is full ({self.max_queue} votes)")
+            self._queues.setdefault(vote["session_id"], []).append(vote)
+            self._depth += 1
+            self._max_depth = max(self._max_depth, self._depth)
+            full = self._depth >= self.max_batch
+        if full:
+            self._wake.set()
+
+    def pending(self, session_id: str) -> List[Dict[str, Any]]:
+        """Returns votes for `session_id` that are still queued."""
+        with self._lock:
+            return list(self._queues.get(session_id, []))
+
+    def flush(self, session_id: Optional[str] = None) -> int:
+        """
+        Writes queued votes to the database in a single bulk upsert.
+        Flushes only `session_id` when given, otherwise every session.
+        Returns the number of votes written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if session_id is None:
+                    batches = list(self._queues.items())
+                    self._queues.clear()
+                else:
+                    votes = self._queues.pop(session_id, None)
+                    batches = [(session_id, votes)] if votes else []
+                rows = [v for _, votes in batches for v in votes]
+                self._depth -= len(rows)
+
+            if not rows:
+                return 0
+
+            start = time.perf_counter()
+            # _write records every row it writes or dead-letters, so a transient
+            # failure part-way through a bisection re-queues only the rest
+            written: List[Dict[str, Any]] = []
+            dropped: List[Dict[str, Any]] = []
+            try:
+                self._write(rows, written, dropped)
+            except Exception as e:
+                handled = {id(v) for v in written + dropped}
+                remaining = [(sid, [v for v in votes if id(v) not in handled]) for sid, votes in batches]
+                remaining = [(sid, votes) for sid, votes in remaining if votes]
+                requeued = sum(len(votes) for _, votes in remaining)
+                logger.warning(f"Vote flush failed, re-queueing {requeued} of {len(rows)} votes: {e}")
+                self._requeue(remaining)
+                with self._lock:
+                    self._failed_flushes += 1
+                    self._flushed_votes += len(written)
+                    self._backoff = min(max(self._backoff * 2, self.flush_interval), VOTE_MAX_BACKOFF_S)
+                    self._retry_at = time.monotonic() + self._backoff
+                return len(written)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            with self._lock:
+                self._backoff = 0.0
+                self._retry_at = 0.0
+                self._flush_count += 1
+                self._flushed_votes += len(written)
+                self._last_flush_ms = elapsed_ms
+                self._total_flush_ms += elapsed_ms
+                self._max_flush_ms = max(self._max_flush_ms, elapsed_ms)
+            return len(written)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Returns queue depth and flush latency stats."""
+        with self._lock:
+            return {
+                "queue_depth": self._depth,
+                "max_queue_depth": self._max_depth,
+                "pending_sessions": len(self._queues),
+                "flush_count": self._flush_count,
+                "failed_flushes": self._failed_flushes,
+                "flushed_votes": self._flushed_votes,
+                "dead_lettered_votes": self._dead_lettered,
+                "rejected_votes": self._rejected,
+                "retry_backoff_ms": int(self._backoff * 1000),
+                "last_flush_ms": round(self._last_flush_ms, 2),
+                "avg_flush_ms": round(self._total_flush_ms / self._flush_count, 2) if self._flush_count else 0.0,
+                "max_flush_ms": round(self._max_flush_ms, 2),
+                "max_batch": self.max_batch,
+                "max_queue": self.max_queue,
+                "flush_interval_ms": int(self.flush_interval * 1000),
+            }
+
+    def _write(self, rows: List[Dict[str, Any]], written: List[Dict[str, Any]], dropped: List[Dict[str, Any]]):
+        # Bisects on data errors so one bad vote only costs O(log n) extra round trips
+        try:
+            self.client.table("votes").upsert(rows).execute()
+            written.extend(rows)
+        except Exception as e:
+            if not _is_data_error(e):
+                raise
+            if len(rows) == 1:
+                self._dead_letter(rows[0], e)
+                dropped.append(rows[0])
+                return
+            mid = len(rows) // 2
+            self._write(rows[:mid], written, dropped)
+            self._write(rows[mid:], written, dropped)
+
+    def _dead_letter(self, vote: Dict[str, Any], error: Exception):
+        logger.error(f"Dropping vote rejected by the database: {json.dumps(vote)} ({error})")
+        with self._lock:
+            self._dead_lettered += 1
+
+    def _requeue(self, batches):
+        # Put failed votes back ahead of anything queued meanwhile to keep per-session order
+        with self._lock:
+            for session_id, votes in batches:
+                self._queues[session_id] = votes + self._queues.get(session_id, [])
+                self._depth += len(votes)
+            self._max_depth = max(self._max_depth, self._depth)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._depth and time.monotonic() >= self._retry_at:
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Vote flusher error: {e}", exc_info=True)
@@ -3,7 +3,7 @@ Yelp AI API Response Mapper
 Handles parsing and mapping of Yelp AI API responses to our internal Recommendation model.
 """
 from typing import List, Dict, Any
-from models import Recommendation
+from models import Recommendation, ConflictAnalysis
 
 
 class YelpAIMapper:
@@ -98,11 +98,7 @@ class YelpAIMapper:
 
         # If content is already a dict (AI returned JSON object directly), usage it
         if isinstance(content, dict):
-            return {
-                "has_conflicts": content.get("has_conflicts", False),
-                "conflicts": content.get("conflicts", []),
-                "resolution": content.get("resolution", "")
-            }
+            return ConflictAnalysis.from_raw(content).model_dump()
 
         # Validate content is string before regex
         if not isinstance(content, str):
@@ -117,12 +113,8 @@ class YelpAIMapper:
         try:
             # Try parsing JSON
             result = json.loads(content)
-            # Ensure keys exist
-            return {
-                "has_conflicts": result.get("has_conflicts", False),
-                "conflicts": result.get("conflicts", []),
-                "resolution": result.get("resolution", "")
-            }
+            # Ensure keys exist and have the stored types (the LLM may return nulls)
+            return ConflictAnalysis.from_raw(result).model_dump()
         except json.JSONDecodeError:
             print(f"⚠️ Failed to parse JSON from conflict content: {content[:100]}...")
             return {"has_conflicts": False, "conflicts": [], "resolution": "Analysis format error."}